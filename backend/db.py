@@ -4,9 +4,11 @@ Supports both SQLite (development) and PostgreSQL (production).
 """
 
 import os
-from sqlalchemy import create_engine, MetaData
+from sqlalchemy import create_engine, event, MetaData
+from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker, AsyncSession
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import NullPool, StaticPool
 from dotenv import load_dotenv
 
 # Load environment variables
@@ -15,27 +17,94 @@ load_dotenv()
 # Database configuration
 DATABASE_URL = os.getenv("DATABASE_URL", "sqlite:///./gotham.db")
 
+
+def _async_url(url: str) -> str:
+    """Map a sync database URL onto its async driver equivalent."""
+    if url.startswith("sqlite://"):
+        return url.replace("sqlite://", "sqlite+aiosqlite://", 1)
+    if url.startswith("postgresql://"):
+        return url.replace("postgresql://", "postgresql+asyncpg://", 1)
+    if url.startswith("postgres://"):
+        return url.replace("postgres://", "postgresql+asyncpg://", 1)
+    return url
+
 # Create SQLAlchemy engine
 if DATABASE_URL.startswith("sqlite"):
     # SQLite configuration
     engine = create_engine(
         DATABASE_URL,
-        connect_args={"check_same_thread": False},  # Needed for SQLite
-        echo=False  # Set to True for SQL query logging
+        # StaticPool keeps in-memory databases alive; file databases use
+        # NullPool so concurrent requests each get a fresh connection and
+        # WAL handles the reader/writer coordination.
+        poolclass=StaticPool if ":memory:" in DATABASE_URL else NullPool,
+        connect_args={"check_same_thread": False, "timeout": 30},  # Needed for SQLite
+        echo=False,  # Set to True for SQL query logging
+        query_cache_size=1200  # Cache compiled SQL for the /crimes filter permutations
     )
+
+    @event.listens_for(engine, "connect")
+    def set_sqlite_pragmas(dbapi_connection, connection_record):
+        """Enable WAL and relaxed sync so readers don't block behind writers."""
+        cursor = dbapi_connection.cursor()
+        cursor.execute("PRAGMA journal_mode=WAL")
+        cursor.execute("PRAGMA synchronous=NORMAL")
+        cursor.execute("PRAGMA temp_store=MEMORY")
+        cursor.execute("PRAGMA mmap_size=268435456")
+        cursor.close()
 else:
     # PostgreSQL configuration
     engine = create_engine(
         DATABASE_URL,
         echo=False,  # Set to True for SQL query logging
-        pool_size=20,
+        pool_size=min(2 * (os.cpu_count() or 4) + 10, 50),  # Sized to cores, capped
         max_overflow=30,
-        pool_pre_ping=True
+        pool_pre_ping=True,
+        pool_recycle=1800,  # Drop connections before server-side idle timeouts
+        pool_timeout=10,
+        query_cache_size=1200,  # Cache compiled SQL for the /crimes filter permutations
+        executemany_mode="values_plus_batch",  # Batched multi-row INSERTs (psycopg2)
+        # Page sizes for the execute_values/execute_batch fast paths, sized
+        # so one ingest chunk (BULK_CHUNK_SIZE rows) is a single server
+        # round trip instead of five
+        executemany_values_page_size=5000,
+        executemany_batch_page_size=500
     )
 
-# Create SessionLocal class
+# Async engine for the FastAPI request path. The sync engine above stays in
+# place for the ingest scripts and the background roll-up refresh; request
+# handlers use AsyncSession so queries cooperate with the event loop instead
+# of blocking it.
+if DATABASE_URL.startswith("sqlite"):
+    async_engine = create_async_engine(
+        _async_url(DATABASE_URL),
+        poolclass=StaticPool if ":memory:" in DATABASE_URL else NullPool,
+        connect_args={"timeout": 30},
+        echo=False,
+        query_cache_size=1200
+    )
+    event.listen(async_engine.sync_engine, "connect", set_sqlite_pragmas)
+else:
+    async_engine = create_async_engine(
+        _async_url(DATABASE_URL),
+        echo=False,
+        pool_size=min(2 * (os.cpu_count() or 4) + 10, 50),
+        max_overflow=30,
+        pool_pre_ping=True,
+        pool_recycle=1800,
+        pool_timeout=10,
+        query_cache_size=1200
+    )
+
+# Create SessionLocal class (sync - used by the ingest script and jobs)
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
+# Async session factory for request handlers. Hot endpoints open these in
+# an `async with` block scoped to just the query, so pool connections are
+# released before response serialization starts.
+AsyncSessionLocal = async_sessionmaker(
+    async_engine, autocommit=False, autoflush=False, expire_on_commit=False
+)
+
 # Create declarative base
 Base = declarative_base()
 
@@ -43,16 +112,13 @@ Base = declarative_base()
 metadata = MetaData()
 
 
-def get_db():
+async def get_db():
     """
-    Dependency function to get database session.
+    Dependency function to get an async database session.
     Used with FastAPI's Depends() for automatic session management.
     """
-    db = SessionLocal()
-    try:
-        yield db
-    finally:
-        db.close()
+    async with AsyncSessionLocal() as session:
+        yield session
 
 
 def create_tables():
@@ -60,6 +126,10 @@ def create_tables():
     Create all tables in the database.
     Call this when initializing the application.
     """
+    if engine.dialect.name == "postgresql":
+        # Needed for the trigram (gin_trgm_ops) indexes on crime_events
+        with engine.begin() as conn:
+            conn.exec_driver_sql("CREATE EXTENSION IF NOT EXISTS pg_trgm")
     Base.metadata.create_all(bind=engine)
 
 
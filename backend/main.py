@@ -5,14 +5,18 @@ A powerful data intelligence API for crime analytics and visualization.
 
 from fastapi import FastAPI, Depends, HTTPException, Query
 from fastapi.middleware.cors import CORSMiddleware
-from sqlalchemy.orm import Session
-from sqlalchemy import func, and_, or_
+from fastapi.responses import ORJSONResponse, StreamingResponse
+import orjson
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import func, and_, or_, select, case, text
 from typing import List, Optional, Dict, Any
 from datetime import datetime, timedelta
+from cachetools import TTLCache
+import asyncio
 import logging
 
 # Local imports
-from db import get_db, create_tables, get_db_info
+from db import get_db, create_tables, get_db_info, SessionLocal, AsyncSessionLocal
 from models import CrimeEvent, Borough, CrimeStats
 
 # Configure logging
@@ -25,7 +29,10 @@ app = FastAPI(
     description="A powerful data intelligence platform for crime analytics",
     version="1.0.0",
     docs_url="/docs",
-    redoc_url="/redoc"
+    redoc_url="/redoc",
+    # orjson serializes the datetime/float-heavy crime payloads several
+    # times faster than stdlib json and handles datetime natively
+    default_response_class=ORJSONResponse
 )
 
 # Configure CORS for frontend integration
@@ -37,12 +44,173 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Columns returned by the /crimes list endpoint. Selecting these directly
+# (instead of full CrimeEvent instances) skips ORM object construction and
+# the per-row to_dict() call.
+_CRIME_LIST_COLUMNS = (
+    CrimeEvent.id,
+    CrimeEvent.complaint_number,
+    CrimeEvent.occurrence_date,
+    CrimeEvent.report_date,
+    CrimeEvent.offense_description,
+    CrimeEvent.law_category,
+    CrimeEvent.specific_offense,
+    CrimeEvent.borough,
+    CrimeEvent.precinct,
+    CrimeEvent.address,
+    CrimeEvent.latitude,
+    CrimeEvent.longitude,
+    CrimeEvent.location_description,
+    CrimeEvent.premises_type,
+    CrimeEvent.status,
+    CrimeEvent.arrest_made,
+    CrimeEvent.victim_age_group,
+    CrimeEvent.victim_gender,
+    CrimeEvent.victim_race,
+    CrimeEvent.created_at,
+    CrimeEvent.data_source,
+)
+
+# The closed borough domain from the model's Enum. User-supplied borough
+# filters are checked against it before they reach the database - on
+# PostgreSQL asyncpg rejects out-of-domain enum bind values, which would
+# otherwise surface as a 500.
+BOROUGH_VALUES = frozenset(CrimeEvent.borough.type.enums)
+
+
+def _validate_borough(borough: Optional[str]) -> Optional[str]:
+    """Uppercase an optional borough filter, rejecting unknown values."""
+    if borough is None:
+        return None
+    borough = borough.upper()
+    if borough not in BOROUGH_VALUES:
+        raise HTTPException(status_code=422, detail=f"Unknown borough: {borough}")
+    return borough
+
+
+# Cached total for unfiltered /crimes requests - counting the whole table on
+# every page fetch is the single biggest cost of that endpoint. The ingest
+# pipeline is batch-based, so a short TTL is safe.
+_total_crimes_cache = TTLCache(maxsize=1, ttl=60)
+
+
+async def _get_total_crimes(db: AsyncSession) -> int:
+    """Return the (cached) total number of crime events."""
+    total = _total_crimes_cache.get("total")
+    if total is None:
+        total = await db.scalar(select(func.count(CrimeEvent.id)))
+        _total_crimes_cache["total"] = total
+    return total
+
+
+# Query-result cache for the analytics endpoints. The dataset only changes
+# on batch ingest, so the GROUP BY scans behind /stats/* can be reused for
+# a few minutes. The version counter lets an ingest invalidate every entry
+# at once by changing the keys.
+_stats_cache = TTLCache(maxsize=256, ttl=300)
+_stats_cache_version = 0
+
+
+def _stats_cache_key(endpoint: str, **params) -> tuple:
+    """Build a cache key from the endpoint name and its query arguments."""
+    return (endpoint, _stats_cache_version, tuple(sorted(params.items())))
+
+
+def invalidate_stats_cache():
+    """Invalidate all cached analytics results (call after an ingest)."""
+    global _stats_cache_version
+    _stats_cache_version += 1
+    _total_crimes_cache.clear()
+
+
+# How often the crime_stats roll-up is rebuilt, in seconds
+STATS_REFRESH_INTERVAL = 300
+
+# Advisory-lock key serializing crime_stats rebuilds across workers
+_STATS_REFRESH_LOCK_KEY = 824_117
+
+
+def refresh_crime_stats():
+    """
+    Rebuild the daily crime_stats roll-up from crime_events.
+    The analytics endpoints aggregate this (small) table instead of
+    re-scanning raw events on every request.
+    """
+    session = SessionLocal()
+    try:
+        # Every worker refreshes on its own schedule, and the rebuild is
+        # delete-then-reinsert: under READ COMMITTED two interleaved
+        # refreshes would each delete the old DAILY rows and both insert
+        # their own copy, doubling every count. The transaction-scoped
+        # advisory lock makes rebuilds run one at a time; it releases
+        # automatically at commit/rollback. SQLite needs no guard - its
+        # single-writer locking already serializes the transactions.
+        if session.get_bind().dialect.name == "postgresql":
+            session.execute(
+                text("SELECT pg_advisory_xact_lock(:key)"),
+                {"key": _STATS_REFRESH_LOCK_KEY}
+            )
+
+        rollup = session.query(
+            CrimeEvent.occurrence_day,
+            CrimeEvent.borough,
+            CrimeEvent.offense_description,
+            CrimeEvent.law_category,
+            func.count(CrimeEvent.id).label('crime_count'),
+            func.sum(
+                case((CrimeEvent.arrest_made.is_(True), 1), else_=0)
+            ).label('arrest_count')
+        ).group_by(
+            CrimeEvent.occurrence_day,
+            CrimeEvent.borough,
+            CrimeEvent.offense_description,
+            CrimeEvent.law_category
+        ).all()
+
+        session.query(CrimeStats).filter(CrimeStats.period_type == "DAILY").delete()
+
+        session.bulk_insert_mappings(CrimeStats, [
+            {
+                "stat_date": datetime(day.year, day.month, day.day) if day else None,
+                "period_type": "DAILY",
+                "borough": borough,
+                "offense_category": offense,
+                "law_category": law_category,
+                "crime_count": crime_count,
+                "arrest_count": int(arrest_count or 0)
+            }
+            for day, borough, offense, law_category, crime_count, arrest_count in rollup
+        ])
+        session.commit()
+        invalidate_stats_cache()
+        logger.info(f"crime_stats roll-up refreshed ({len(rollup)} buckets)")
+    except Exception as e:
+        logger.error(f"Error refreshing crime_stats roll-up: {str(e)}")
+        session.rollback()
+    finally:
+        session.close()
+
+
+async def _rollup_available(db: AsyncSession) -> bool:
+    """Whether the crime_stats roll-up has been built yet."""
+    return bool(await db.scalar(select(func.count(CrimeStats.id))))
+
+
+async def _stats_refresh_loop():
+    """Background task that periodically rebuilds the roll-up."""
+    while True:
+        await asyncio.sleep(STATS_REFRESH_INTERVAL)
+        await asyncio.to_thread(refresh_crime_stats)
+
+
 # Create tables on startup
 @app.on_event("startup")
 async def startup_event():
-    """Initialize database tables on application startup."""
+    """Initialize database tables and the stats roll-up on startup."""
     create_tables()
     logger.info("Database tables created successfully")
+    refresh_crime_stats()
+    asyncio.create_task(_stats_refresh_loop())
 
 
 # Health check and info endpoints
@@ -58,11 +226,18 @@ async def root():
 
 
 @app.get("/health", tags=["Health"])
-async def health_check(db: Session = Depends(get_db)):
+async def health_check(db: AsyncSession = Depends(get_db)):
     """Detailed health check including database connectivity."""
     try:
-        # Test database connection
-        crime_count = db.query(CrimeEvent).count()
+        # Test database connection. On PostgreSQL the planner statistics
+        # give an instant approximate row count - good enough for a health
+        # check and free even on huge tables.
+        if db.bind.dialect.name == "postgresql":
+            crime_count = await db.scalar(text(
+                "SELECT reltuples::bigint FROM pg_class WHERE relname = 'crime_events'"
+            ))
+        else:
+            crime_count = await db.scalar(select(func.count(CrimeEvent.id)))
         db_info = get_db_info()
         
         return {
@@ -86,9 +261,9 @@ async def health_check(db: Session = Depends(get_db)):
 # Crime data endpoints
 @app.get("/crimes", tags=["Crime Data"])
 async def get_crimes(
-    db: Session = Depends(get_db),
     skip: int = Query(0, ge=0, description="Number of records to skip"),
     limit: int = Query(100, ge=1, le=1000, description="Number of records to return"),
+    after_id: Optional[int] = Query(None, ge=0, description="Keyset cursor: return records with id greater than this"),
     borough: Optional[str] = Query(None, description="Filter by borough"),
     offense: Optional[str] = Query(None, description="Filter by offense type"),
     start_date: Optional[str] = Query(None, description="Start date (YYYY-MM-DD)"),
@@ -101,49 +276,108 @@ async def get_crimes(
     """
     Get crime events with optional filtering and pagination.
     Supports geographic bounding box, date range, and text filters.
+    Pass the returned next_after value as after_id to paginate without
+    the O(skip) cost of deep OFFSETs.
     """
+    # Validated outside the try so the 422 isn't swallowed by the
+    # catch-all below
+    borough = _validate_borough(borough)
+
     try:
-        query = db.query(CrimeEvent)
-        
-        # Apply filters
+        # Build the filter list once so the predicate executes in one query
+        filters = []
+
         if borough:
-            query = query.filter(CrimeEvent.borough.ilike(f"%{borough}%"))
-        
+            # Borough values are a normalized uppercase enum - equality
+            # hits the index directly instead of a LIKE scan
+            filters.append(CrimeEvent.borough == borough)
+
         if offense:
-            query = query.filter(CrimeEvent.offense_description.ilike(f"%{offense}%"))
-        
+            filters.append(CrimeEvent.offense_description.ilike(f"%{offense}%"))
+
         if start_date:
             start_dt = datetime.fromisoformat(start_date)
-            query = query.filter(CrimeEvent.occurrence_date >= start_dt)
-        
+            filters.append(CrimeEvent.occurrence_date >= start_dt)
+
         if end_date:
             end_dt = datetime.fromisoformat(end_date)
-            query = query.filter(CrimeEvent.occurrence_date <= end_dt)
-        
-        # Geographic bounding box filter
-        if all([lat_min, lat_max, lng_min, lng_max]):
-            query = query.filter(
-                and_(
-                    CrimeEvent.latitude >= lat_min,
-                    CrimeEvent.latitude <= lat_max,
-                    CrimeEvent.longitude >= lng_min,
-                    CrimeEvent.longitude <= lng_max
-                )
+            filters.append(CrimeEvent.occurrence_date <= end_dt)
+
+        # Geographic bounding box filter. Each bound is applied on its own:
+        # partial boxes work, and a legitimate 0.0 coordinate is not
+        # mistaken for "absent" the way a truthiness check would.
+        if lat_min is not None:
+            filters.append(CrimeEvent.latitude >= lat_min)
+        if lat_max is not None:
+            filters.append(CrimeEvent.latitude <= lat_max)
+        if lng_min is not None:
+            filters.append(CrimeEvent.longitude >= lng_min)
+        if lng_max is not None:
+            filters.append(CrimeEvent.longitude <= lng_max)
+
+        # Keyset (seek) pagination: O(limit) regardless of page depth,
+        # unlike OFFSET which walks and discards `skip` rows. OFFSET is
+        # still honored when no cursor is given.
+        if after_id is not None:
+            filters.append(CrimeEvent.id > after_id)
+            skip = 0
+
+        if filters:
+            # Window-function count: the total rides along with the page rows,
+            # so the filter predicate is evaluated only once.
+            # Single combined predicate and explicit PK ordering: the SQL
+            # shape stays stable (better statement-cache hit rate) and
+            # LIMIT/OFFSET pages are deterministic.
+            stmt = (
+                select(*_CRIME_LIST_COLUMNS, func.count().over().label("_total"))
+                .where(and_(*filters))
+                .order_by(CrimeEvent.id)
+                .offset(skip)
+                .limit(limit)
             )
-        
-        # Get total count for pagination info
-        total = query.count()
-        
-        # Apply pagination and get results
-        crimes = query.offset(skip).limit(limit).all()
-        
+            # Hold the session (and its pool connection) only for the query
+            # itself, not for the Python-side response building below
+            async with AsyncSessionLocal() as db:
+                rows = (await db.execute(stmt)).all()
+                if rows:
+                    total = rows[0]._mapping["_total"]
+                elif after_id is None:
+                    # A page past the end returns no rows for the window
+                    # count to ride on; count the predicate separately so
+                    # the client still sees the true filtered total
+                    total = (await db.scalar(
+                        select(func.count())
+                        .select_from(CrimeEvent)
+                        .where(and_(*filters))
+                    )) or 0
+                else:
+                    # Exhausted keyset cursor: nothing left past after_id
+                    total = 0
+            data = [
+                {key: value for key, value in row._mapping.items() if key != "_total"}
+                for row in rows
+            ]
+        else:
+            # Unfiltered fast-path: serve the page and a cached table count
+            stmt = (
+                select(*_CRIME_LIST_COLUMNS)
+                .order_by(CrimeEvent.id)
+                .offset(skip)
+                .limit(limit)
+            )
+            async with AsyncSessionLocal() as db:
+                rows = (await db.execute(stmt)).all()
+                total = await _get_total_crimes(db)
+            data = [dict(row._mapping) for row in rows]
+
         return {
-            "data": [crime.to_dict() for crime in crimes],
+            "data": data,
             "pagination": {
                 "total": total,
                 "skip": skip,
                 "limit": limit,
-                "pages": (total + limit - 1) // limit
+                "pages": (total + limit - 1) // limit,
+                "next_after": data[-1]["id"] if data else None
             },
             "filters": {
                 "borough": borough,
@@ -155,7 +389,7 @@ async def get_crimes(
                     "lat_max": lat_max,
                     "lng_min": lng_min,
                     "lng_max": lng_max
-                } if all([lat_min, lat_max, lng_min, lng_max]) else None
+                } if any(b is not None for b in (lat_min, lat_max, lng_min, lng_max)) else None
             }
         }
     
@@ -165,9 +399,9 @@ async def get_crimes(
 
 
 @app.get("/crimes/{crime_id}", tags=["Crime Data"])
-async def get_crime_by_id(crime_id: int, db: Session = Depends(get_db)):
+async def get_crime_by_id(crime_id: int, db: AsyncSession = Depends(get_db)):
     """Get a specific crime event by ID."""
-    crime = db.query(CrimeEvent).filter(CrimeEvent.id == crime_id).first()
+    crime = await db.get(CrimeEvent, crime_id)
     
     if not crime:
         raise HTTPException(status_code=404, detail="Crime not found")
@@ -177,42 +411,78 @@ async def get_crime_by_id(crime_id: int, db: Session = Depends(get_db)):
 
 # Analytics and statistics endpoints
 @app.get("/stats/summary", tags=["Analytics"])
-async def get_crime_summary(db: Session = Depends(get_db)):
+async def get_crime_summary(db: AsyncSession = Depends(get_db)):
     """Get overall crime statistics summary."""
     try:
-        total_crimes = db.query(CrimeEvent).count()
-        
-        # Crime by borough
-        borough_stats = db.query(
-            CrimeEvent.borough,
-            func.count(CrimeEvent.id).label('count')
-        ).group_by(CrimeEvent.borough).all()
-        
-        # Crime by category
-        offense_stats = db.query(
-            CrimeEvent.law_category,
-            func.count(CrimeEvent.id).label('count')
-        ).group_by(CrimeEvent.law_category).all()
-        
-        # Recent activity (last 30 days)
+        cache_key = _stats_cache_key("summary")
+        cached = _stats_cache.get(cache_key)
+        if cached is not None:
+            return cached
+
         thirty_days_ago = datetime.utcnow() - timedelta(days=30)
-        recent_crimes = db.query(CrimeEvent).filter(
-            CrimeEvent.occurrence_date >= thirty_days_ago
-        ).count()
+
+        if await _rollup_available(db):
+            # Aggregate the pre-built roll-up instead of raw events
+            total_crimes = await db.scalar(select(func.sum(CrimeStats.crime_count))) or 0
+
+            borough_stats = (await db.execute(
+                select(
+                    CrimeStats.borough,
+                    func.sum(CrimeStats.crime_count).label('count')
+                ).group_by(CrimeStats.borough)
+            )).all()
+
+            offense_stats = (await db.execute(
+                select(
+                    CrimeStats.law_category,
+                    func.sum(CrimeStats.crime_count).label('count')
+                ).group_by(CrimeStats.law_category)
+            )).all()
+
+            recent_crimes = await db.scalar(
+                select(func.sum(CrimeStats.crime_count))
+                .where(CrimeStats.stat_date >= thirty_days_ago)
+            ) or 0
+        else:
+            total_crimes = await db.scalar(select(func.count(CrimeEvent.id)))
+
+            # Crime by borough
+            borough_stats = (await db.execute(
+                select(
+                    CrimeEvent.borough,
+                    func.count(CrimeEvent.id).label('count')
+                ).group_by(CrimeEvent.borough)
+            )).all()
+
+            # Crime by category
+            offense_stats = (await db.execute(
+                select(
+                    CrimeEvent.law_category,
+                    func.count(CrimeEvent.id).label('count')
+                ).group_by(CrimeEvent.law_category)
+            )).all()
+
+            # Recent activity (last 30 days)
+            recent_crimes = await db.scalar(
+                select(func.count(CrimeEvent.id))
+                .where(CrimeEvent.occurrence_date >= thirty_days_ago)
+            )
         
-        return {
+        result = {
             "total_crimes": total_crimes,
             "recent_crimes_30d": recent_crimes,
             "borough_breakdown": [
-                {"borough": stat[0], "count": stat[1]} 
+                {"borough": stat[0], "count": stat[1]}
                 for stat in borough_stats if stat[0]
             ],
             "offense_breakdown": [
-                {"category": stat[0], "count": stat[1]} 
+                {"category": stat[0], "count": stat[1]}
                 for stat in offense_stats if stat[0]
             ],
             "last_updated": datetime.utcnow().isoformat()
         }
+        _stats_cache[cache_key] = result
+        return result
     
     except Exception as e:
         logger.error(f"Error generating summary stats: {str(e)}")
@@ -220,18 +490,50 @@ async def get_crime_summary(db: Session = Depends(get_db)):
 
 
 @app.get("/stats/boroughs", tags=["Analytics"])
-async def get_borough_stats(db: Session = Depends(get_db)):
+async def get_borough_stats(db: AsyncSession = Depends(get_db)):
     """Get detailed statistics for each borough."""
     try:
-        borough_data = db.query(
-            CrimeEvent.borough,
-            func.count(CrimeEvent.id).label('total_crimes'),
-            func.count(func.distinct(CrimeEvent.offense_description)).label('unique_offenses'),
-            func.avg(CrimeEvent.latitude).label('avg_lat'),
-            func.avg(CrimeEvent.longitude).label('avg_lng')
-        ).group_by(CrimeEvent.borough).all()
-        
-        return {
+        cache_key = _stats_cache_key("boroughs")
+        cached = _stats_cache.get(cache_key)
+        if cached is not None:
+            return cached
+
+        if await _rollup_available(db):
+            # Counts come from the roll-up; centers come from the (tiny)
+            # boroughs reference table instead of averaging every event
+            borough_data = (await db.execute(
+                select(
+                    CrimeStats.borough,
+                    func.sum(CrimeStats.crime_count).label('total_crimes'),
+                    func.count(func.distinct(CrimeStats.offense_category)).label('unique_offenses')
+                ).group_by(CrimeStats.borough)
+            )).all()
+
+            centers = {
+                b.name: (
+                    (b.north_bound + b.south_bound) / 2,
+                    (b.east_bound + b.west_bound) / 2
+                )
+                for b in (await db.execute(select(Borough))).scalars()
+                if b.north_bound is not None and b.east_bound is not None
+            }
+
+            borough_data = [
+                (name, total, unique, *centers.get(name, (None, None)))
+                for name, total, unique in borough_data
+            ]
+        else:
+            borough_data = (await db.execute(
+                select(
+                    CrimeEvent.borough,
+                    func.count(CrimeEvent.id).label('total_crimes'),
+                    func.count(func.distinct(CrimeEvent.offense_description)).label('unique_offenses'),
+                    func.avg(CrimeEvent.latitude).label('avg_lat'),
+                    func.avg(CrimeEvent.longitude).label('avg_lng')
+                ).group_by(CrimeEvent.borough)
+            )).all()
+
+        result = {
             "boroughs": [
                 {
                     "name": data[0],
@@ -245,6 +547,8 @@ async def get_borough_stats(db: Session = Depends(get_db)):
                 for data in borough_data if data[0]
             ]
         }
+        _stats_cache[cache_key] = result
+        return result
     
     except Exception as e:
         logger.error(f"Error generating borough stats: {str(e)}")
@@ -253,27 +557,46 @@ async def get_borough_stats(db: Session = Depends(get_db)):
 
 @app.get("/stats/timeline", tags=["Analytics"])
 async def get_crime_timeline(
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
     days: int = Query(30, ge=1, le=365, description="Number of days to include")
 ):
     """Get crime count timeline for the specified number of days."""
     try:
+        cache_key = _stats_cache_key("timeline", days=days)
+        cached = _stats_cache.get(cache_key)
+        if cached is not None:
+            return cached
+
         start_date = datetime.utcnow() - timedelta(days=days)
-        
-        # Group by date
-        timeline_data = db.query(
-            func.date(CrimeEvent.occurrence_date).label('date'),
-            func.count(CrimeEvent.id).label('count')
-        ).filter(
-            CrimeEvent.occurrence_date >= start_date
-        ).group_by(
-            func.date(CrimeEvent.occurrence_date)
-        ).order_by('date').all()
-        
-        return {
+
+        if await _rollup_available(db):
+            timeline_data = (await db.execute(
+                select(
+                    CrimeStats.stat_date.label('date'),
+                    func.sum(CrimeStats.crime_count).label('count')
+                ).where(
+                    CrimeStats.period_type == "DAILY",
+                    CrimeStats.stat_date >= start_date
+                ).group_by(CrimeStats.stat_date).order_by('date')
+            )).all()
+        else:
+            # Group by the denormalized day column so the aggregation runs
+            # as an index range scan instead of casting per row
+            timeline_data = (await db.execute(
+                select(
+                    CrimeEvent.occurrence_day.label('date'),
+                    func.count(CrimeEvent.id).label('count')
+                ).where(
+                    CrimeEvent.occurrence_day >= start_date.date()
+                ).group_by(
+                    CrimeEvent.occurrence_day
+                ).order_by('date')
+            )).all()
+
+        result = {
             "timeline": [
                 {
-                    "date": str(data[0]),
+                    "date": str(data[0].date() if isinstance(data[0], datetime) else data[0]),
                     "count": data[1]
                 }
                 for data in timeline_data
@@ -282,6 +605,8 @@ async def get_crime_timeline(
             "start_date": start_date.isoformat(),
             "end_date": datetime.utcnow().isoformat()
         }
+        _stats_cache[cache_key] = result
+        return result
     
     except Exception as e:
         logger.error(f"Error generating timeline: {str(e)}")
@@ -291,46 +616,76 @@ async def get_crime_timeline(
 # Geographic endpoints
 @app.get("/geo/heatmap", tags=["Geographic"])
 async def get_heatmap_data(
-    db: Session = Depends(get_db),
     borough: Optional[str] = Query(None, description="Filter by borough")
 ):
-    """Get coordinate data for heatmap visualization."""
+    """Get binned coordinate data for heatmap visualization."""
+    borough = _validate_borough(borough)
+
     try:
-        query = db.query(
-            CrimeEvent.latitude,
-            CrimeEvent.longitude,
-            CrimeEvent.offense_description
-        ).filter(
+        # Aggregate in SQL: bin coordinates to ~100m cells and count per cell,
+        # so the payload scales with distinct cells instead of total rows.
+        lat_bin = func.round(CrimeEvent.latitude, 3).label("lat")
+        lng_bin = func.round(CrimeEvent.longitude, 3).label("lng")
+
+        stmt = select(
+            lat_bin,
+            lng_bin,
+            func.count().label("weight")
+        ).where(
             and_(
                 CrimeEvent.latitude.isnot(None),
                 CrimeEvent.longitude.isnot(None)
             )
         )
-        
+
         if borough:
-            query = query.filter(CrimeEvent.borough.ilike(f"%{borough}%"))
-        
-        coordinates = query.all()
-        
-        return {
-            "heatmap_points": [
-                {
-                    "lat": float(coord[0]),
-                    "lng": float(coord[1]),
-                    "offense": coord[2]
-                }
-                for coord in coordinates
-                if coord[0] and coord[1]
-            ],
-            "total_points": len(coordinates),
-            "filter": {"borough": borough}
-        }
-    
+            stmt = stmt.where(CrimeEvent.borough == borough)
+
+        stmt = stmt.group_by(lat_bin, lng_bin).execution_options(
+            stream_results=True, yield_per=5000
+        )
+
+        async def stream_cells():
+            """Yield the response JSON cell by cell from a streamed cursor."""
+            yield b'{"heatmap_points":['
+            total_points = 0
+            first = True
+            async with AsyncSessionLocal() as db:
+                result = await db.stream(stmt)
+                async for cell in result:
+                    point = orjson.dumps({
+                        "lat": float(cell.lat),
+                        "lng": float(cell.lng),
+                        "weight": cell.weight
+                    })
+                    yield point if first else b"," + point
+                    first = False
+                    total_points += cell.weight
+            yield b'],"total_points":%d,"filter":%s}' % (
+                total_points,
+                orjson.dumps({"borough": borough})
+            )
+
+        # Stream so peak memory is bounded by the cursor batch, not the
+        # full result set, and first bytes go out before the scan finishes
+        return StreamingResponse(stream_cells(), media_type="application/json")
+
     except Exception as e:
         logger.error(f"Error generating heatmap data: {str(e)}")
         raise HTTPException(status_code=500, detail="Error generating heatmap data")
 
 
 if __name__ == "__main__":
+    import os
     import uvicorn
-    uvicorn.run(app, host="0.0.0.0", port=8000, reload=True)
+    # One worker per core with uvloop/httptools. Reload mode disables
+    # these optimizations and pins throughput to a single core; use
+    # `uvicorn main:app --reload` directly during development instead.
+    uvicorn.run(
+        "main:app",
+        host="0.0.0.0",
+        port=8000,
+        workers=os.cpu_count(),
+        loop="uvloop",
+        http="httptools"
+    )
@@ -3,7 +3,8 @@ SQLAlchemy models for Mini Palantir Gotham.
 Defines the database schema for crime events and related data.
 """
 
-from sqlalchemy import Column, Integer, String, Float, DateTime, Text, Boolean
+from sqlalchemy import Column, Integer, String, Float, Date, DateTime, Text, Boolean, Enum, Index
+from sqlalchemy.orm import relationship, foreign
 from sqlalchemy.sql import func
 from db import Base
 import datetime
@@ -15,6 +16,23 @@ class CrimeEvent(Base):
     Based on NYC Open Data crime structure with additional analytics fields.
     """
     __tablename__ = "crime_events"
+    __table_args__ = (
+        # Composite indexes matching the filter combinations used by
+        # /crimes and /stats: date + borough, borough + category, and
+        # bounding box + date. The lat/lng prefix also serves the heatmap
+        # binning as an index-only scan.
+        Index("ix_ce_date_borough", "occurrence_date", "borough"),
+        Index("ix_ce_borough_category", "borough", "law_category"),
+        Index("ix_ce_lat_lng_date", "latitude", "longitude", "occurrence_date"),
+        # Trigram GIN index (PostgreSQL only) turns the ILIKE '%...%'
+        # offense filter on /crimes into index lookups instead of full
+        # scans. Requires the pg_trgm extension from db.create_tables().
+        Index(
+            "ix_crime_offense_trgm", "offense_description",
+            postgresql_using="gin",
+            postgresql_ops={"offense_description": "gin_trgm_ops"}
+        ).ddl_if(dialect="postgresql"),
+    )
 
     # Primary key
     id = Column(Integer, primary_key=True, index=True)
@@ -24,6 +42,9 @@ class CrimeEvent(Base):
     
     # Date and time information
     occurrence_date = Column(DateTime, index=True)
+    # Calendar day of occurrence_date, denormalized at ingest so the
+    # timeline GROUP BY hits an index instead of casting every row
+    occurrence_day = Column(Date, index=True)
     report_date = Column(DateTime, index=True)
     
     # Crime classification
@@ -31,8 +52,13 @@ class CrimeEvent(Base):
     law_category = Column(String(50), index=True)  # FELONY, MISDEMEANOR, VIOLATION
     specific_offense = Column(String(100))
     
-    # Location information
-    borough = Column(String(20), index=True)
+    # Location information. Borough is a closed 5-value set, normalized to
+    # uppercase at ingest so the API can filter by plain equality.
+    borough = Column(
+        Enum("MANHATTAN", "BROOKLYN", "QUEENS", "BRONX", "STATEN ISLAND",
+             name="borough_enum"),
+        index=True
+    )
     precinct = Column(Integer, index=True)
     jurisdiction = Column(String(50))
     
@@ -71,17 +97,32 @@ class CrimeEvent(Base):
     # Data source tracking
     data_source = Column(String(50), default="NYC_OPENDATA")
     data_quality_score = Column(Float, default=1.0)  # 0.0 to 1.0
-    
+
+    # Borough reference, joined on the name column. lazy="raise" makes any
+    # accidental per-row lazy load fail loudly - handlers that need it must
+    # eager-load explicitly, e.g. .options(selectinload(CrimeEvent.borough_ref))
+    borough_ref = relationship(
+        "Borough",
+        primaryjoin="foreign(CrimeEvent.borough) == Borough.name",
+        viewonly=True,
+        lazy="raise",
+        back_populates="crime_events"
+    )
+
     def __repr__(self):
         return f"<CrimeEvent(id={self.id}, offense='{self.offense_description}', borough='{self.borough}')>"
     
     def to_dict(self):
-        """Convert crime event to dictionary for API responses."""
+        """
+        Convert crime event to dictionary for API responses.
+        Datetimes are returned as-is; orjson formats them natively at
+        serialization time, which is cheaper than per-field isoformat().
+        """
         return {
             "id": self.id,
             "complaint_number": self.complaint_number,
-            "occurrence_date": self.occurrence_date.isoformat() if self.occurrence_date else None,
-            "report_date": self.report_date.isoformat() if self.report_date else None,
+            "occurrence_date": self.occurrence_date,
+            "report_date": self.report_date,
             "offense_description": self.offense_description,
             "law_category": self.law_category,
             "specific_offense": self.specific_offense,
@@ -97,7 +138,7 @@ class CrimeEvent(Base):
             "victim_age_group": self.victim_age_group,
             "victim_gender": self.victim_gender,
             "victim_race": self.victim_race,
-            "created_at": self.created_at.isoformat() if self.created_at else None,
+            "created_at": self.created_at,
             "data_source": self.data_source
         }
 
@@ -125,7 +166,16 @@ class Borough(Base):
     
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     updated_at = Column(DateTime(timezone=True), onupdate=func.now())
-    
+
+    # Reverse side of CrimeEvent.borough_ref; same lazy="raise" safety net
+    crime_events = relationship(
+        "CrimeEvent",
+        primaryjoin="foreign(CrimeEvent.borough) == Borough.name",
+        viewonly=True,
+        lazy="raise",
+        back_populates="borough_ref"
+    )
+
     def to_dict(self):
         return {
             "id": self.id,
@@ -161,7 +211,8 @@ class CrimeStats(Base):
     
     # Crime type
     offense_category = Column(String(100), index=True)
-    
+    law_category = Column(String(50), index=True)  # FELONY, MISDEMEANOR, VIOLATION
+
     # Statistics
     crime_count = Column(Integer, default=0)
     arrest_count = Column(Integer, default=0)
@@ -176,11 +227,12 @@ class CrimeStats(Base):
     def to_dict(self):
         return {
             "id": self.id,
-            "stat_date": self.stat_date.isoformat() if self.stat_date else None,
+            "stat_date": self.stat_date,
             "period_type": self.period_type,
             "borough": self.borough,
             "precinct": self.precinct,
             "offense_category": self.offense_category,
+            "law_category": self.law_category,
             "crime_count": self.crime_count,
             "arrest_count": self.arrest_count,
             "clearance_rate": self.clearance_rate,
@@ -4,10 +4,15 @@ Handles data ingestion from CSV files and creates sample data if needed.
 """
 
 import pandas as pd
+import numpy as np
+import io
 import os
 import random
-from datetime import datetime, timedelta
-from sqlalchemy.orm import sessionmaker
+import orjson
+import requests
+from contextlib import nullcontext
+from datetime import datetime
+from sqlalchemy.exc import IntegrityError
 from db import engine, create_tables
 from models import CrimeEvent, Borough
 import logging
@@ -16,8 +21,163 @@ import logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
-# Create session
-Session = sessionmaker(bind=engine)
+# Rows per bulk INSERT during ingest
+BULK_CHUNK_SIZE = 5000
+
+# Rows parsed per read_csv chunk; bounds peak memory so files larger than
+# RAM still ingest
+CSV_CHUNK_SIZE = 50_000
+
+# NYC Open Data (Socrata) complaints dataset and page size for API ingest
+NYC_API_URL = "https://data.cityofnewyork.us/resource/5uac-w243.json"
+API_PAGE_SIZE = 50_000
+
+# Socrata field -> crime_events column. Unmapped API fields are dropped by
+# the _INGEST_COLUMNS projection in _normalize_dataframe.
+_API_COLUMN_MAP = {
+    'cmplnt_num': 'complaint_number',
+    'cmplnt_fr_dt': 'occurrence_date',
+    'rpt_dt': 'report_date',
+    'ofns_desc': 'offense_description',
+    'law_cat_cd': 'law_category',
+    'pd_desc': 'specific_offense',
+    'boro_nm': 'borough',
+    'addr_pct_cd': 'precinct',
+    'loc_of_occur_desc': 'location_description',
+    'prem_typ_desc': 'premises_type',
+    'vic_age_group': 'victim_age_group',
+    'vic_sex': 'victim_gender',
+    'vic_race': 'victim_race',
+    'susp_age_group': 'suspect_age_group',
+    'susp_sex': 'suspect_gender',
+    'susp_race': 'suspect_race',
+}
+
+# Explicit CSV schema so the C parser writes straight into typed buffers
+# instead of re-inferring every column. Low-cardinality strings use
+# 'category', which also shrinks in-memory size by roughly an order of
+# magnitude on real extracts. Numeric and boolean columns are read as
+# strings on purpose: a strict dtype makes one malformed cell abort the
+# whole read, while _normalize_dataframe's errors='coerce' pass turns it
+# into NULL and keeps the rest of the file.
+CSV_DTYPES = {
+    'complaint_number': 'string',
+    'offense_description': 'string',
+    'law_category': 'category',
+    'specific_offense': 'string',
+    'borough': 'category',
+    'precinct': 'string',
+    'address': 'string',
+    'latitude': 'string',
+    'longitude': 'string',
+    'location_description': 'category',
+    'premises_type': 'category',
+    'status': 'category',
+    'arrest_made': 'string',
+    'victim_age_group': 'category',
+    'victim_gender': 'category',
+    'victim_race': 'category',
+    'suspect_age_group': 'category',
+    'suspect_gender': 'category',
+    'suspect_race': 'category',
+    'data_source': 'category'
+}
+CSV_DATE_COLUMNS = ['occurrence_date', 'report_date']
+
+
+def _read_crime_csv(csv_path, **kwargs):
+    """Read a crime CSV with the explicit schema, tolerating absent columns."""
+    header = pd.read_csv(csv_path, nrows=0).columns
+    return pd.read_csv(
+        csv_path,
+        dtype={col: dtype for col, dtype in CSV_DTYPES.items() if col in header},
+        parse_dates=[col for col in CSV_DATE_COLUMNS if col in header],
+        low_memory=False,
+        **kwargs
+    )
+
+
+# The closed borough domain, taken from the model's Enum. Anything else
+# (blank, '(null)' in real NYC extracts, typos) becomes NULL - the
+# non-validating Enum would otherwise pass it through and PostgreSQL
+# rejects values outside borough_enum at the driver level.
+_BOROUGH_VALUES = frozenset(CrimeEvent.borough.type.enums)
+
+# crime_events columns populated by the CSV ingest
+_INGEST_COLUMNS = [
+    'complaint_number', 'occurrence_date', 'occurrence_day', 'report_date',
+    'offense_description', 'law_category', 'specific_offense', 'borough',
+    'precinct', 'address', 'latitude', 'longitude', 'location_description',
+    'premises_type', 'status', 'arrest_made', 'victim_age_group',
+    'victim_gender', 'victim_race', 'suspect_age_group', 'suspect_gender',
+    'suspect_race', 'data_source'
+]
+
+
+def _normalize_dataframe(df):
+    """
+    Coerce a raw CSV frame into crime_events column types.
+    Each column is converted in a single vectorized pass instead of the
+    O(rows x columns) per-cell pd.notna()/str()/float() calls.
+    """
+    df = df.copy()
+
+    # Make sure every target column exists so the coercions are uniform
+    for col in _INGEST_COLUMNS:
+        if col not in df.columns:
+            df[col] = None
+
+    # Dates (plus the denormalized calendar day)
+    df['occurrence_date'] = pd.to_datetime(df['occurrence_date'], errors='coerce')
+    df['report_date'] = pd.to_datetime(df['report_date'], errors='coerce')
+    df['occurrence_day'] = df['occurrence_date'].dt.date
+
+    # Identifiers and required text. The intermediate 'string' cast keeps
+    # NA semantics intact for category-typed columns before fillna.
+    # Fallback labels come from the frame index, which read_csv keeps
+    # globally increasing across chunks, so they stay unique per file
+    df['complaint_number'] = df['complaint_number'].astype('string').fillna(
+        pd.Series([f"UNK_{i}" for i in df.index], index=df.index, dtype='string')
+    ).astype(str)
+    for col in ('offense_description', 'law_category', 'specific_offense'):
+        df[col] = df[col].astype('string').fillna('').astype(str)
+    borough = df['borough'].astype('string').str.strip().str.upper()
+    df['borough'] = borough.where(borough.isin(_BOROUGH_VALUES))
+    df['status'] = df['status'].astype('string').fillna('OPEN').astype(str)
+    df['data_source'] = df['data_source'].astype('string').fillna('CSV_IMPORT').astype(str)
+
+    # Optional text columns stay NULL when missing
+    for col in ('address', 'location_description', 'premises_type',
+                'victim_age_group', 'victim_gender', 'victim_race',
+                'suspect_age_group', 'suspect_gender', 'suspect_race'):
+        df[col] = df[col].astype('string')
+
+    # Numerics and flags
+    df['precinct'] = pd.to_numeric(df['precinct'], errors='coerce').astype('Int64')
+    df['latitude'] = pd.to_numeric(df['latitude'], errors='coerce')
+    df['longitude'] = pd.to_numeric(df['longitude'], errors='coerce')
+    # arrest_made arrives as text now; anything not a recognized truthy
+    # spelling (including NA) becomes False
+    arrest = df['arrest_made'].astype('string').str.strip().str.lower()
+    df['arrest_made'] = arrest.isin(('true', 't', '1', 'yes')).astype(bool)
+
+    # NaN/NaT/NA -> None so the driver binds proper SQL NULLs
+    subset = df[_INGEST_COLUMNS]
+    return subset.astype(object).where(subset.notna(), None)
+
+
+def _sample_coordinates(rng, borough_idx, lat_lo, lat_hi, lng_lo, lng_hi):
+    """
+    Draw one (lat, lng) point inside the bounds of each record's borough.
+
+    Takes only typed arrays and returns only arrays, so for very large
+    synthetic datasets the body could be compiled with numba.njit as-is;
+    at the current sample sizes plain NumPy is already fast enough to not
+    justify the dependency.
+    """
+    latitudes = np.round(rng.uniform(lat_lo[borough_idx], lat_hi[borough_idx]), 6)
+    longitudes = np.round(rng.uniform(lng_lo[borough_idx], lng_hi[borough_idx]), 6)
+    return latitudes, longitudes
 
 
 def create_sample_data():
@@ -82,59 +242,64 @@ def create_sample_data():
     genders = ["M", "F", "U"]
     races = ["BLACK", "WHITE", "HISPANIC", "ASIAN", "OTHER", "UNKNOWN"]
     
-    sample_data = []
-    
-    # Generate 1000 sample records
-    for i in range(1000):
-        # Random borough
-        borough = random.choice(list(boroughs_info.keys()))
-        borough_info = boroughs_info[borough]
-        
-        # Random coordinates within borough bounds
-        lat_range = borough_info["bounds"]["lat_range"]
-        lng_range = borough_info["bounds"]["lng_range"]
-        latitude = round(random.uniform(lat_range[0], lat_range[1]), 6)
-        longitude = round(random.uniform(lng_range[0], lng_range[1]), 6)
-        
-        # Random crime type
-        offense_desc, law_cat, specific_offense = random.choice(crime_types)
-        
-        # Random dates (within last 2 years)
-        days_ago = random.randint(1, 730)
-        occurrence_date = datetime.now() - timedelta(days=days_ago)
-        report_date = occurrence_date + timedelta(days=random.randint(0, 7))
-        
-        # Random precinct (simplified)
-        precinct = random.randint(1, 123)
-        
-        record = {
-            "complaint_number": f"2024{str(i+1).zfill(6)}",
-            "occurrence_date": occurrence_date,
-            "report_date": report_date,
-            "offense_description": offense_desc,
-            "law_category": law_cat,
-            "specific_offense": specific_offense,
-            "borough": borough,
-            "precinct": precinct,
-            "latitude": latitude,
-            "longitude": longitude,
-            "location_description": random.choice(["INSIDE", "OUTSIDE", "FRONT OF", "REAR OF"]),
-            "premises_type": random.choice(location_types),
-            "status": random.choice(["COMPLETED", "OPEN", "CLOSED"]),
-            "arrest_made": random.choice([True, False]),
-            "victim_age_group": random.choice(age_groups),
-            "victim_gender": random.choice(genders),
-            "victim_race": random.choice(races),
-            "suspect_age_group": random.choice(age_groups) if random.random() > 0.3 else None,
-            "suspect_gender": random.choice(genders) if random.random() > 0.3 else None,
-            "suspect_race": random.choice(races) if random.random() > 0.3 else None,
-            "data_source": "SAMPLE_DATA"
-        }
-        
-        sample_data.append(record)
-    
-    # Create DataFrame and save as CSV
-    df = pd.DataFrame(sample_data)
+    n = 1000
+    rng = np.random.default_rng()
+
+    # Vectorized numeric generation: boroughs, coordinates, crime types,
+    # dates, and precincts are drawn as whole arrays in C instead of ~20
+    # Python RNG dispatches per record
+    boroughs_keys = list(boroughs_info.keys())
+    lat_lo = np.array([boroughs_info[b]["bounds"]["lat_range"][0] for b in boroughs_keys])
+    lat_hi = np.array([boroughs_info[b]["bounds"]["lat_range"][1] for b in boroughs_keys])
+    lng_lo = np.array([boroughs_info[b]["bounds"]["lng_range"][0] for b in boroughs_keys])
+    lng_hi = np.array([boroughs_info[b]["bounds"]["lng_range"][1] for b in boroughs_keys])
+
+    borough_idx = rng.integers(0, len(boroughs_keys), n)
+    latitudes, longitudes = _sample_coordinates(
+        rng, borough_idx, lat_lo, lat_hi, lng_lo, lng_hi
+    )
+
+    crime_idx = rng.integers(0, len(crime_types), n)
+    precincts = rng.integers(1, 124, n)
+
+    # Random dates (within last 2 years) from a single now() reading
+    now = np.datetime64(datetime.now(), 's')
+    occurrence_dates = now - rng.integers(1, 731, n).astype('timedelta64[D]')
+    report_dates = occurrence_dates + rng.integers(0, 8, n).astype('timedelta64[D]')
+
+    # Categorical columns: one random.choices(k=n) call per column instead
+    # of n random.choice dispatches. The suspect fields are drawn the same
+    # way, then ~30% are masked to None in a single vectorized pass.
+    def _masked(samples):
+        return [v if keep else None for v, keep in zip(samples, rng.random(n) > 0.3)]
+
+    # Build the frame column-by-column straight from the arrays above.
+    # pandas stores each column as one contiguous block this way, instead
+    # of exploding n dicts into cells and re-inferring every dtype.
+    crime_cols = np.array(crime_types)
+    df = pd.DataFrame({
+        "complaint_number": np.char.add("2024", np.char.zfill(np.arange(1, n + 1).astype("<U6"), 6)),
+        "occurrence_date": occurrence_dates,
+        "report_date": report_dates,
+        "offense_description": crime_cols[crime_idx, 0],
+        "law_category": crime_cols[crime_idx, 1],
+        "specific_offense": crime_cols[crime_idx, 2],
+        "borough": np.array(boroughs_keys)[borough_idx],
+        "precinct": precincts,
+        "latitude": latitudes,
+        "longitude": longitudes,
+        "location_description": random.choices(("INSIDE", "OUTSIDE", "FRONT OF", "REAR OF"), k=n),
+        "premises_type": random.choices(location_types, k=n),
+        "status": random.choices(("COMPLETED", "OPEN", "CLOSED"), k=n),
+        "arrest_made": rng.integers(0, 2, n).astype(bool),
+        "victim_age_group": random.choices(age_groups, k=n),
+        "victim_gender": random.choices(genders, k=n),
+        "victim_race": random.choices(races, k=n),
+        "suspect_age_group": _masked(random.choices(age_groups, k=n)),
+        "suspect_gender": _masked(random.choices(genders, k=n)),
+        "suspect_race": _masked(random.choices(races, k=n)),
+        "data_source": "SAMPLE_DATA"
+    })
     
     # Ensure data directory exists
     os.makedirs("../data", exist_ok=True)
@@ -146,102 +311,221 @@ def create_sample_data():
     return df
 
 
-def ingest_csv_data(csv_path):
+def _apply_bulk_load_pragmas(conn):
+    """
+    Relax SQLite durability for a bulk-load connection.
+
+    db.py already puts every SQLite connection in WAL with
+    synchronous=NORMAL. A load is idempotent (full delete + reload), so
+    its connection can go further: no fsyncs at all and a bigger page
+    cache for the duration. NullPool discards the connection afterwards,
+    so nothing to restore. Must run before the first DML statement -
+    pysqlite refuses to change the safety level once the transaction has
+    actually opened.
+    """
+    if engine.dialect.name == "sqlite":
+        conn.exec_driver_sql("PRAGMA synchronous=OFF")
+        conn.exec_driver_sql("PRAGMA cache_size=-65536")  # 64 MB
+
+
+def _try_copy_chunk(conn, frame):
+    """
+    Stream one normalized chunk through PostgreSQL COPY FROM STDIN.
+
+    COPY skips per-row INSERT parsing entirely and is the fastest bulk
+    path Postgres offers. Returns False on a constraint violation (the
+    SAVEPOINT keeps the outer transaction clean) so the caller can rerun
+    that chunk through the slower INSERT path with its per-row fallback.
+    """
+    # Match the INSERT path row for row: Python-side column defaults are
+    # applied explicitly (COPY never sees them), and NULL gets the \N
+    # sentinel so empty strings stay empty strings instead of collapsing
+    # to NULL under COPY's default empty-string NULL marker.
+    frame = frame.assign(data_quality_score=1.0)
+    buf = io.StringIO()
+    frame.to_csv(buf, index=False, header=False, na_rep='\\N')
+    buf.seek(0)
+    copy_sql = (
+        f"COPY crime_events ({', '.join(_INGEST_COLUMNS + ['data_quality_score'])}) "
+        "FROM STDIN WITH (FORMAT csv, NULL '\\N')"
+    )
+    try:
+        with conn.begin_nested():
+            cursor = conn.connection.cursor()
+            try:
+                cursor.copy_expert(copy_sql, buf)
+            finally:
+                cursor.close()
+        return True
+    except (IntegrityError, engine.dialect.dbapi.IntegrityError):
+        # Raw-cursor errors come straight from the driver, not wrapped by
+        # SQLAlchemy, so both flavours are caught here
+        return False
+
+
+def ingest_csv_data(csv_path, conn=None):
     """
     Ingest crime data from CSV file into the database.
+
+    When a connection is passed in, the load joins the caller's
+    transaction (main() shares one across borough init and the ingest);
+    otherwise it opens and commits its own.
     """
     logger.info(f"Starting data ingestion from {csv_path}")
-    
+
     # Check if file exists
     if not os.path.exists(csv_path):
         logger.warning(f"CSV file not found at {csv_path}")
         logger.info("Creating sample data...")
-        df = create_sample_data()
+        create_sample_data()
         csv_path = "../data/sample_crime_data.csv"
-    else:
-        # Read CSV file
-        try:
-            df = pd.read_csv(csv_path)
-            logger.info(f"Loaded {len(df)} records from CSV")
-        except Exception as e:
-            logger.error(f"Error reading CSV file: {str(e)}")
-            return False
-    
-    # Create database session
-    session = Session()
-    
+
+    shared = conn is not None
     try:
-        # Clear existing data
-        logger.info("Clearing existing crime data...")
-        session.query(CrimeEvent).delete()
-        session.commit()
-        
-        # Process each row
-        successful_inserts = 0
-        failed_inserts = 0
-        
-        for index, row in df.iterrows():
-            try:
-                # Create CrimeEvent object
-                crime_event = CrimeEvent(
-                    complaint_number=str(row.get('complaint_number', f"UNK_{index}")),
-                    occurrence_date=pd.to_datetime(row.get('occurrence_date')) if pd.notna(row.get('occurrence_date')) else None,
-                    report_date=pd.to_datetime(row.get('report_date')) if pd.notna(row.get('report_date')) else None,
-                    offense_description=str(row.get('offense_description', '')),
-                    law_category=str(row.get('law_category', '')),
-                    specific_offense=str(row.get('specific_offense', '')),
-                    borough=str(row.get('borough', '')),
-                    precinct=int(row.get('precinct', 0)) if pd.notna(row.get('precinct')) else None,
-                    address=str(row.get('address', '')) if pd.notna(row.get('address')) else None,
-                    latitude=float(row.get('latitude')) if pd.notna(row.get('latitude')) else None,
-                    longitude=float(row.get('longitude')) if pd.notna(row.get('longitude')) else None,
-                    location_description=str(row.get('location_description', '')) if pd.notna(row.get('location_description')) else None,
-                    premises_type=str(row.get('premises_type', '')) if pd.notna(row.get('premises_type')) else None,
-                    status=str(row.get('status', 'OPEN')),
-                    arrest_made=bool(row.get('arrest_made', False)) if pd.notna(row.get('arrest_made')) else False,
-                    victim_age_group=str(row.get('victim_age_group', '')) if pd.notna(row.get('victim_age_group')) else None,
-                    victim_gender=str(row.get('victim_gender', '')) if pd.notna(row.get('victim_gender')) else None,
-                    victim_race=str(row.get('victim_race', '')) if pd.notna(row.get('victim_race')) else None,
-                    suspect_age_group=str(row.get('suspect_age_group', '')) if pd.notna(row.get('suspect_age_group')) else None,
-                    suspect_gender=str(row.get('suspect_gender', '')) if pd.notna(row.get('suspect_gender')) else None,
-                    suspect_race=str(row.get('suspect_race', '')) if pd.notna(row.get('suspect_race')) else None,
-                    data_source=str(row.get('data_source', 'CSV_IMPORT'))
-                )
-                
-                session.add(crime_event)
-                successful_inserts += 1
-                
-                # Commit every 100 records to avoid memory issues
-                if successful_inserts % 100 == 0:
-                    session.commit()
-                    logger.info(f"Processed {successful_inserts} records...")
-                
-            except Exception as e:
-                logger.warning(f"Failed to insert row {index}: {str(e)}")
-                failed_inserts += 1
-                session.rollback()
-        
-        # Final commit
-        session.commit()
-        
+        # Stream the file in bounded chunks instead of materializing one
+        # giant frame: peak memory stays at CSV_CHUNK_SIZE rows no matter
+        # how large the extract is, so files bigger than RAM still ingest.
+        # Each chunk gets the vectorized coercion pass, then goes straight
+        # to the bulk insert.
+        #
+        # Single transaction for the delete and every insert chunk: one
+        # COMMIT (one fsync/WAL flush) for the whole load, and the old
+        # data comes back if any chunk fails
+        total_inserted = 0
+        total_skipped = 0
+        insert_stmt = CrimeEvent.__table__.insert()
+        with (nullcontext(conn) if shared else engine.begin()) as conn:
+            # In shared mode main() has already applied the bulk-load
+            # pragmas before any DML touched the connection
+            if not shared:
+                _apply_bulk_load_pragmas(conn)
+
+            logger.info("Clearing existing crime data...")
+            conn.execute(CrimeEvent.__table__.delete())
+
+            # Drop secondary indexes for the duration of the load and
+            # rebuild them once at the end: one O(n log n) build per index
+            # instead of a B-tree update per inserted row. The unique
+            # complaint_number index stays - it enforces a constraint, not
+            # just a lookup path. DDL here is transactional on both SQLite
+            # and PostgreSQL, so a failed load rolls the drops back too.
+            secondary_indexes = [
+                ix for ix in CrimeEvent.__table__.indexes if not ix.unique
+            ]
+            for index in secondary_indexes:
+                index.drop(bind=conn, checkfirst=True)
+
+            for chunk in _read_crime_csv(csv_path, chunksize=CSV_CHUNK_SIZE):
+                normalized = _normalize_dataframe(chunk)
+
+                # On Postgres, stream the chunk through COPY; only a chunk
+                # that trips a constraint drops down to the INSERT path
+                # below for its row-level fallback
+                if engine.dialect.name == "postgresql" and _try_copy_chunk(conn, normalized):
+                    total_inserted += len(normalized)
+                    logger.info(f"Inserted {total_inserted} records...")
+                    continue
+
+                records = normalized.to_dict(orient="records")
+                for start in range(0, len(records), BULK_CHUNK_SIZE):
+                    batch = records[start:start + BULK_CHUNK_SIZE]
+                    # Fast path: one executemany per batch. Only a batch
+                    # that trips a constraint (e.g. duplicate complaint
+                    # numbers in the file) is retried row by row, skipping
+                    # just the bad rows. The SAVEPOINTs keep a failed
+                    # statement from poisoning the outer transaction.
+                    try:
+                        with conn.begin_nested():
+                            conn.execute(insert_stmt, batch)
+                        total_inserted += len(batch)
+                    except IntegrityError:
+                        for row in batch:
+                            try:
+                                with conn.begin_nested():
+                                    conn.execute(insert_stmt, [row])
+                                total_inserted += 1
+                            except IntegrityError:
+                                total_skipped += 1
+                logger.info(f"Inserted {total_inserted} records...")
+
+            logger.info("Rebuilding indexes...")
+            for index in secondary_indexes:
+                index.create(bind=conn)
+
         logger.info(f"Data ingestion completed!")
-        logger.info(f"Successfully inserted: {successful_inserts} records")
-        logger.info(f"Failed inserts: {failed_inserts} records")
-        
+        logger.info(f"Successfully inserted: {total_inserted} records")
+        if total_skipped:
+            logger.warning(f"Skipped {total_skipped} records that violated constraints")
+
         return True
-        
+
     except Exception as e:
+        if shared:
+            # The caller owns the transaction; it must see the failure
+            # rather than commit a half-finished load
+            raise
         logger.error(f"Error during data ingestion: {str(e)}")
-        session.rollback()
         return False
-        
-    finally:
-        session.close()
 
 
-def initialize_boroughs():
+def fetch_api_data(max_records=100_000, api_url=NYC_API_URL):
+    """
+    Ingest crime data straight from the NYC Open Data (Socrata) API.
+
+    Pages through the dataset with $limit/$offset on one pooled
+    requests.Session connection instead of a single giant request, so no
+    full-dataset list is ever materialized. Each page goes through the same
+    vectorized normalization as the CSV path and is bulk-inserted before
+    the next page is requested, keeping memory bounded at one page.
+    """
+    logger.info(f"Fetching up to {max_records} records from {api_url}")
+
+    try:
+        total_inserted = 0
+        insert_stmt = CrimeEvent.__table__.insert()
+        with requests.Session() as http, engine.begin() as conn:
+            logger.info("Clearing existing crime data...")
+            conn.execute(CrimeEvent.__table__.delete())
+
+            offset = 0
+            while offset < max_records:
+                page_size = min(API_PAGE_SIZE, max_records - offset)
+                response = http.get(
+                    api_url,
+                    params={"$limit": page_size, "$offset": offset, "$order": ":id"},
+                    timeout=60
+                )
+                response.raise_for_status()
+                # orjson parses the list-of-dicts payload 2-4x faster than
+                # the stdlib json used by response.json()
+                page = orjson.loads(response.content)
+                if not page:
+                    break
+
+                df = pd.DataFrame(page).rename(columns=_API_COLUMN_MAP)
+                df['data_source'] = 'NYC_OPENDATA'
+                records = _normalize_dataframe(df).to_dict(orient="records")
+                for start in range(0, len(records), BULK_CHUNK_SIZE):
+                    conn.execute(insert_stmt, records[start:start + BULK_CHUNK_SIZE])
+
+                total_inserted += len(records)
+                offset += len(page)
+                logger.info(f"Inserted {total_inserted} records...")
+
+        logger.info(f"API ingestion completed: {total_inserted} records")
+        return True
+
+    except Exception as e:
+        logger.error(f"Error during API ingestion: {str(e)}")
+        return False
+
+
+def initialize_boroughs(conn=None):
     """
     Initialize borough reference data.
+
+    Like ingest_csv_data, joins the caller's transaction when a
+    connection is passed in.
     """
     logger.info("Initializing borough data...")
     
@@ -293,27 +577,13 @@ def initialize_boroughs():
         }
     ]
     
-    session = Session()
-    
-    try:
-        # Clear existing borough data
-        session.query(Borough).delete()
-        session.commit()
-        
-        # Insert borough data
-        for borough_data in boroughs_data:
-            borough = Borough(**borough_data)
-            session.add(borough)
-        
-        session.commit()
-        logger.info("Borough data initialized successfully")
-        
-    except Exception as e:
-        logger.error(f"Error initializing borough data: {str(e)}")
-        session.rollback()
-    
-    finally:
-        session.close()
+    # Five fixed rows: clear and reload via Core in one executemany, no
+    # ORM session needed
+    with (nullcontext(conn) if conn is not None else engine.begin()) as conn:
+        conn.execute(Borough.__table__.delete())
+        conn.execute(Borough.__table__.insert(), boroughs_data)
+
+    logger.info("Borough data initialized successfully")
 
 
 def main():
@@ -324,21 +594,27 @@ def main():
     
     # Create tables
     create_tables()
-    
-    # Initialize borough data
-    initialize_boroughs()
-    
+
     # Try to ingest from existing CSV, or create sample data
     csv_path = "../data/nyc_crime_data.csv"
-    
+
     if not os.path.exists(csv_path):
         logger.info("No existing crime data found. Creating sample data...")
         create_sample_data()
         csv_path = "../data/sample_crime_data.csv"
-    
-    # Ingest the data
-    success = ingest_csv_data(csv_path)
-    
+
+    # Borough init and crime ingest share one connection and commit
+    # together: one handshake, one WAL flush, and no window where the
+    # boroughs are loaded but the crimes are not
+    try:
+        with engine.begin() as conn:
+            _apply_bulk_load_pragmas(conn)
+            initialize_boroughs(conn)
+            success = ingest_csv_data(csv_path, conn)
+    except Exception as e:
+        logger.error(f"Error during data ingestion: {str(e)}")
+        success = False
+
     if success:
         logger.info("🎉 Data ingestion completed successfully!")
         logger.info("You can now start the FastAPI server with: uvicorn main:app --reload")